@@ -4,21 +4,48 @@ SEC Filings Dashboard — Streamlit
 - Headline → Signals → ONE-PARAGRAPH summary (AI optional)
 - No document preview
 - Throttled SEC + OpenAI requests
-- Key-aware cached AI summaries + Clear cache button
+- Key-aware cached AI summaries + Clear AI cache button
 """
 
-import os, re, time
+import os, re, time, threading, asyncio, hashlib, html
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests, pandas as pd
-from bs4 import BeautifulSoup
+from lxml import etree
 import streamlit as st
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-# Optional OpenAI
+# Optional OpenAI — imported on first use, so runs with AI off never load it
+def openai_cls():
+    try:
+        from openai import OpenAI
+    except Exception:
+        return None
+    return OpenAI
+
+# Optional persistent HTTP cache
+try:
+    from requests_cache import CachedSession, DO_NOT_CACHE, EXPIRE_IMMEDIATELY
+except Exception:
+    CachedSession = None
+
+# Optional Aho-Corasick keyword matcher (C extension)
 try:
-    from openai import OpenAI
+    import ahocorasick
 except Exception:
-    OpenAI = None
+    ahocorasick = None
+
+# Optional Hyperscan multi-regex engine (x86-64 only)
+try:
+    import hyperscan
+except Exception:
+    hyperscan = None
+
+# Optional fast JSON decoder
+try:
+    import orjson
+except Exception:
+    orjson = None
 
 # -------------------- basic config --------------------
 def get_secret(name: str, default: str = "") -> str:
@@ -34,8 +61,19 @@ SEC_BASE = "https://data.sec.gov"
 ARCHIVES = "https://www.sec.gov/Archives"
 HEADERS  = {"User-Agent": SEC_UA, "Accept-Encoding": "gzip, deflate"}
 
+SEC_MAX_RPS     = 8   # SEC fair-access guideline is 10 req/s; keep headroom
+SEC_BURST       = 2   # idle-bucket burst; burst + rate must stay <= 10 in any one second
+SEC_MAX_WORKERS = 5   # concurrent primary-document downloads
+SNIPPET_CHARS    = 4000        # opening text scanned for rule signals
+AI_EXCERPT_CHARS = 6000        # opening text sent to OpenAI
+DOC_MAX_CHARS    = 8192        # extraction stops once this much text is collected (covers both)
+DOC_MAX_BYTES    = 2_000_000   # ...or once this much of the document has been downloaded
+
+OPENAI_RPM = int(get_secret("OPENAI_RPM", "500"))       # account limits; shared by all sessions
+OPENAI_TPM = int(get_secret("OPENAI_TPM", "200000"))
+
 os.environ.setdefault("STREAMLIT_HOME", "/tmp")
-os.environ.setdefault("XDG_CACHE_HOME", "/tmp")
+os.environ.setdefault("XDG_CACHE_HOME", "/data" if os.access("/data", os.W_OK) else "/tmp")   # /data: persistent volume (HF Spaces)
 os.environ.setdefault("STREAMLIT_BROWSER_GATHER_USAGE_STATS", "false")
 
 st.set_page_config(page_title="SEC Filings Dashboard", page_icon="📄", layout="wide")
@@ -46,11 +84,42 @@ def pad_cik(cik: str) -> str:
     s = re.sub(r"\D", "", cik or "")
     return s.zfill(10) if s else ""
 
+def text_digest(text: str) -> str:
+    """Short stable fingerprint for using large text as a cache key."""
+    return hashlib.blake2b((text or "").encode("utf-8", "ignore"), digest_size=16).hexdigest()
+
 # -------------------- HTTP session with retry --------------------
+class SecRetry(Retry):
+    """When SEC answers with Retry-After, pause the shared SEC bucket too, so every
+    thread backs off — not just the one whose request is being retried. urllib3 retries
+    never pass through sec_get, so each retry takes its own token from the bucket here."""
+    def sleep_for_retry(self, response=None):
+        seconds = self.get_retry_after(response) if response is not None else None
+        if seconds:
+            sec_bucket().pause(seconds)
+        return super().sleep_for_retry(response)
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        sec_bucket().acquire()
+
 def make_session() -> requests.Session:
-    s = requests.Session()
+    if CachedSession is not None:
+        # Disk-backed L2 under st.cache_data: survives restarts and revalidates via
+        # ETag/Last-Modified. Archive documents are excluded — caching a streamed
+        # response makes requests-cache read the whole body, defeating DOC_MAX_BYTES.
+        s = CachedSession(
+            os.path.join(os.environ["XDG_CACHE_HOME"], "sec_http_cache"), backend="sqlite",
+            expire_after=3600, cache_control=True, stale_if_error=True,
+            urls_expire_after={
+                "www.sec.gov/Archives/*": DO_NOT_CACHE,
+                "data.sec.gov/submissions/*": EXPIRE_IMMEDIATELY,   # revalidate every fetch (ETag): stays real-time
+            },
+        )
+    else:
+        s = requests.Session()
     s.headers.update(HEADERS)
-    retry = Retry(
+    retry = SecRetry(
         total=4, read=4, connect=4, backoff_factor=0.6,
         status_forcelist=[403, 429, 500, 502, 503, 504],
         allowed_methods=["GET"], raise_on_status=False
@@ -59,46 +128,232 @@ def make_session() -> requests.Session:
     s.mount("https://", ad); s.mount("http://", ad)
     return s
 
-SESSION = make_session()
+@st.cache_resource
+def _session_local() -> threading.local:
+    return threading.local()
+
+@st.cache_resource
+def script_session() -> requests.Session:
+    """Session for calls made on the script thread (submissions, ticker map, on-demand docs).
+    Streamlit starts a new script thread on every rerun, so a thread-local session would be
+    rebuilt — new TLS connection, new cache connection — each time; this one is kept."""
+    return make_session()
+
+def _init_worker_session() -> None:
+    _session_local().session = make_session()
+
+def thread_session() -> requests.Session:
+    """Prefetch workers each own a session (requests.Session is not documented thread-safe),
+    created once when the pool starts the worker; any other thread uses script_session()."""
+    return getattr(_session_local(), "session", None) or script_session()
+
+# -------------------- rate limiting --------------------
+class TokenBucket:
+    """Thread-safe token bucket: bursts up to `capacity`, refills at `rate` tokens/sec.
+    acquire() only blocks when the bucket is empty."""
+    def __init__(self, rate: float, capacity: float):
+        self.rate, self.capacity = rate, capacity
+        self._tokens = capacity
+        self._ts = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def acquire(self, n: float = 1.0) -> None:
+        n = min(n, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                wait = (n - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every acquirer for about `seconds` from now (e.g. a server's Retry-After).
+        Overlapping pauses don't add up; the longest one wins."""
+        with self._lock:
+            self._refill()   # time already elapsed must not be credited against the pause
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+@st.cache_resource
+def sec_bucket() -> TokenBucket:
+    return TokenBucket(SEC_MAX_RPS, SEC_BURST)
+
+@st.cache_resource
+def openai_buckets() -> tuple[TokenBucket, TokenBucket]:
+    """(requests/min, tokens/min) buckets."""
+    return TokenBucket(OPENAI_RPM / 60, OPENAI_RPM), TokenBucket(OPENAI_TPM / 60, OPENAI_TPM)
+
+def openai_acquire(est_tokens: int) -> None:
+    rpm, tpm = openai_buckets()
+    rpm.acquire(); tpm.acquire(est_tokens)
+
+def sec_get(url: str, **kw) -> requests.Response:
+    """Every SEC request goes through here so all sessions share one rate limit."""
+    sec_bucket().acquire()
+    return thread_session().get(url, **kw)
+
+@st.cache_resource
+def doc_executor() -> ThreadPoolExecutor:
+    """Shared across reruns/sessions so the worker count stays bounded."""
+    return ThreadPoolExecutor(max_workers=SEC_MAX_WORKERS, thread_name_prefix="sec-doc",
+                              initializer=_init_worker_session)
 
 # -------------------- SEC helpers --------------------
+def response_json(r: requests.Response):
+    """Decode straight from the body bytes with orjson when available."""
+    return orjson.loads(r.content) if orjson else r.json()
+
 @st.cache_data(show_spinner=False, ttl=900)
 def fetch_company_submissions(cik10: str) -> dict:
-    r = SESSION.get(f"{SEC_BASE}/submissions/CIK{cik10}.json", timeout=30)
+    r = sec_get(f"{SEC_BASE}/submissions/CIK{cik10}.json", timeout=30)
     if r.status_code == 403:
         st.warning("SEC 403: check your SEC_USER_AGENT in Secrets.")
     r.raise_for_status()
-    return r.json()
+    return response_json(r)
 
-@st.cache_data(show_spinner=False, ttl=3600)
-def fetch_company_ticker_map() -> pd.DataFrame:
-    r = SESSION.get(f"{SEC_BASE}/files/company_tickers.json", timeout=30)
+FILING_COLS = ["accessionNumber","filingDate","reportDate","acceptanceDateTime",
+               "form","items","size","primaryDocument","primaryDocDescription"]
+
+@st.cache_data(show_spinner=False, ttl=900)
+def _filings_frame(cik10: str, newest: str, n: int, _recent: dict) -> pd.DataFrame:
+    df = pd.DataFrame({c: _recent.get(c) or [None]*n for c in FILING_COLS})
+    text = [df[c].fillna("").astype(str) for c in FILING_COLS if c != "size"]   # size: the only numeric field
+    df["_search"] = text[0].str.cat(text[1:], sep="\x1f").str.lower()           # \x1f: no match spans two fields
+    return df
+
+def filings_frame(cik10: str, recent: dict) -> pd.DataFrame:
+    """Recent filings, built column-wise, plus `_search`: the text fields lowercased and
+    joined once per submissions payload, so a keyword filter is a single str.contains.
+    Keyed on (newest accession, filing count) of the payload passed in, so the frame can
+    never outlive the submissions it was built from."""
+    acc = recent.get("accessionNumber") or []
+    return _filings_frame(cik10, acc[0] if acc else "", len(acc), recent)
+
+@st.cache_data(show_spinner=False, ttl=86400)
+def fetch_ticker_cik_map() -> dict:
+    """{TICKER: padded CIK}; the first listing wins for duplicate tickers."""
+    r = sec_get(f"{SEC_BASE}/files/company_tickers.json", timeout=30)
     r.raise_for_status()
-    rows = [{"cik": str(x.get("cik_str","")).zfill(10),
-             "ticker": x.get("ticker",""),
-             "title": x.get("title","")} for x in r.json()]
-    return pd.DataFrame(rows)
+    m = {}
+    for x in response_json(r).values():
+        m.setdefault(str(x.get("ticker", "")).upper(), pad_cik(str(x.get("cik_str", ""))))
+    return m
 
-@st.cache_data(show_spinner=False, ttl=3600)
 def cik_from_ticker(ticker: str) -> str:
     if not ticker: return ""
     try:
-        df = fetch_company_ticker_map()
-        hit = df[df["ticker"].str.upper() == ticker.upper()]
-        return pad_cik(hit.iloc[0]["cik"]) if not hit.empty else ""
+        return fetch_ticker_cik_map().get(ticker.upper(), "")
     except Exception:
         st.warning("Ticker lookup failed (rate-limit / not found). Try CIK mode.")
         return ""
 
-@st.cache_data(show_spinner=False, ttl=3600)
-def get_primary_doc_text(cik10: str, accession_no: str, primary_doc: str) -> str:
-    acc = accession_no.replace("-", "")
-    url = f"{ARCHIVES}/edgar/data/{int(cik10)}/{acc}/{primary_doc}"
-    r = SESSION.get(url, timeout=60)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "lxml")
-    for t in soup(["script","style"]): t.decompose()
-    return soup.get_text("\n", strip=True)[:400000]
+class _TextCollector:
+    """lxml parser target (SAX-style): text outside script/style/noscript in document order,
+    one stripped line per text node (like BeautifulSoup's get_text("\\n", strip=True))."""
+    SKIP = {"script", "style", "noscript"}
+
+    def __init__(self, limit: int):
+        self.parts, self.size, self.limit = [], 0, limit
+        self._pending, self._skip = [], 0
+
+    @property
+    def full(self) -> bool:
+        return self.size >= self.limit
+
+    def _flush(self) -> None:
+        if self._pending:
+            s = "".join(self._pending).strip()
+            self._pending.clear()
+            if s:
+                self.parts.append(s); self.size += len(s) + 1
+
+    def start(self, tag, attrib, nsmap=None):
+        self._flush()
+        if tag in self.SKIP: self._skip += 1
+
+    def end(self, tag):
+        self._flush()
+        if tag in self.SKIP and self._skip: self._skip -= 1
+
+    def data(self, data):
+        if not self._skip: self._pending.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def close(self) -> str:
+        self._flush()
+        return "\n".join(self.parts)
+
+XML_TAG_RE = re.compile(rb"<[^>]*>")
+
+def _is_plain_doc(url: str) -> bool:
+    """.txt and raw .xml documents (e.g. an ownership-form XML). XML under an xsl*/ folder
+    is SEC's rendered HTML view and still goes through the HTML parser."""
+    folder, _, name = url.lower().rpartition("/")
+    return name.endswith(".txt") or (name.endswith(".xml") and not folder.rpartition("/")[2].startswith("xsl"))
+
+def _plain_doc_text(url: str) -> str:
+    """Text of a .txt / raw .xml document without an HTML parser: XML tags are stripped by
+    regex, then one stripped line per text line. Same limits as the HTML path."""
+    xml = url.lower().endswith(".xml")
+    sep = b">" if xml else b"\n"    # only complete tags / lines are processed per chunk
+    lines, size, read, rest = [], 0, 0, b""
+
+    def take(data: bytes) -> None:
+        nonlocal size
+        if xml: data = XML_TAG_RE.sub(b"\n", data)
+        for line in data.split(b"\n"):
+            line = line.strip()
+            if line:
+                lines.append(line); size += len(line) + 1
+
+    with sec_get(url, timeout=60, stream=True) as r:
+        r.raise_for_status()
+        for chunk in r.iter_content(16 * 1024):
+            read += len(chunk)
+            data = rest + chunk
+            cut = data.rfind(sep) + 1
+            take(data[:cut]); rest = data[cut:]
+            if size >= DOC_MAX_CHARS or read >= DOC_MAX_BYTES: break
+        else:
+            take(rest)   # trailing text after the last tag/newline
+    text = b"\n".join(lines).decode("utf-8", "replace")
+    return (html.unescape(text) if xml else text)[:DOC_MAX_CHARS]
+
+# Archived documents never change, so the cache is persisted to disk (no TTL) and survives
+# restarts when the deployment sets HOME to the /data volume (Streamlit writes it under
+# ~/.streamlit/cache; see README). max_entries only bounds the in-memory layer;
+# pickles on disk are never evicted (a few KB each, since text is capped at DOC_MAX_CHARS).
+@st.cache_data(show_spinner=False, persist="disk", max_entries=500)
+def get_primary_doc_text(url: str) -> str:
+    """Opening text of a filing's primary document (`url` is the df's url_primary).
+
+    The body is streamed straight into an incremental lxml parser; reading stops once
+    DOC_MAX_CHARS of text have been collected or DOC_MAX_BYTES downloaded. Only the
+    opening text is ever used, so a 10-K costs a few chunks, not tens of MB. No DOM is built.
+    Plain-text and raw XML documents skip the HTML parser (see _plain_doc_text).
+    """
+    if _is_plain_doc(url):
+        return _plain_doc_text(url)
+    collector = _TextCollector(DOC_MAX_CHARS)
+    parser = etree.HTMLParser(target=collector)   # fed bytes: lxml sniffs the charset itself
+    read = 0
+    with sec_get(url, timeout=60, stream=True) as r:
+        r.raise_for_status()
+        for chunk in r.iter_content(16 * 1024):
+            parser.feed(chunk)
+            read += len(chunk)
+            if collector.full or read >= DOC_MAX_BYTES: break
+    if not read:
+        return ""
+    return parser.close()[:DOC_MAX_CHARS]
 
 # -------------------- rule-based signals --------------------
 KEY_PATTERNS = {
@@ -110,9 +365,86 @@ KEY_PATTERNS = {
     "material":  r"Item\s*1\.01|Material Definitive Agreement|Item\s*2\.01|acquisition|disposition|Item\s*3\.02|unregistered|Item\s*5\.02|departure|appointment|Item\s*5\.07|shareholder|vote",
 }
 
+def lower_pattern(p: str) -> str:
+    """Lowercase a pattern's literals but not its escapes (\\S must not become \\s)."""
+    return re.sub(r"\\.|[^\\]+", lambda m: m[0] if m[0].startswith("\\") else m[0].lower(), p)
+
+# Matching runs on a lowercased snippet (one str.lower()) with lowercased patterns,
+# so no regex needs re.IGNORECASE.
+KEY_PATTERNS_LC = {k: lower_pattern(p) for k, p in KEY_PATTERNS.items()}
+
+# All categories fused into one pass. Each category sits in a zero-width lookahead, so
+# overlapping matches that start at different positions are all seen. Matches that start
+# at the same position are not: the first category's branch wins there and the others are
+# skipped. No two of today's patterns can match at the same start, so results equal one
+# re.search per pattern; keep it that way when adding keywords.
+KEY_RE = re.compile("|".join(f"(?=(?P<{k}>{p}))" for k, p in KEY_PATTERNS_LC.items()))
+
+@st.cache_resource
+def build_key_automaton() -> tuple:
+    """Plain-keyword alternatives go into one Aho-Corasick automaton (lowercased);
+    the few real regexes (e.g. Item\\s*1\\.01) stay as a small per-category residual."""
+    automaton, residual = ahocorasick.Automaton(), {}
+    for cat, p in KEY_PATTERNS_LC.items():
+        rest = []
+        for alt in p.split("|"):
+            if re.fullmatch(r"[\w \-]+", alt):
+                automaton.add_word(alt, automaton.get(alt, ()) + (cat,))
+            else:
+                rest.append(alt)
+        if rest:
+            residual[cat] = re.compile("|".join(rest))
+    automaton.make_automaton()
+    return automaton, residual
+
+KEY_AC = build_key_automaton() if ahocorasick else None
+
+@st.cache_resource
+def build_key_hyperscan() -> tuple:
+    """All categories in one Hyperscan block database (DFA, one match per category),
+    plus per-thread scratch space — a scratch can't be shared by concurrent scans.
+    UTF8 + UCP give \\s Python's Unicode meaning, so EDGAR's "Item&#160;1.01" (U+00A0) matches."""
+    cats = list(KEY_PATTERNS_LC)
+    flag = hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+    db = hyperscan.Database()
+    db.compile(expressions=[KEY_PATTERNS_LC[k].encode() for k in cats], ids=list(range(len(cats))),
+               elements=len(cats), flags=[flag] * len(cats))
+    return db, cats, threading.local()
+
+KEY_HS = build_key_hyperscan() if hyperscan else None
+
+def _hs_on_match(pattern_id, start, end, flags, found):
+    found.add(pattern_id)
+
+def key_hits(snippet: str) -> dict:
+    """{category: matched?} for KEY_PATTERNS over the snippet (case-insensitive), in a single
+    pass that stops as soon as every category has matched.
+    Engine: Hyperscan, else Aho-Corasick + residual regexes, else the fused KEY_RE."""
+    found, n = set(), len(KEY_PATTERNS)
+    snippet = snippet.lower()
+    if KEY_HS:
+        db, cats, local = KEY_HS
+        if not hasattr(local, "scratch"):
+            local.scratch = hyperscan.Scratch(db)
+        ids = set()
+        db.scan(snippet.encode("utf-8", "ignore"), match_event_handler=_hs_on_match, context=ids, scratch=local.scratch)
+        found = {cats[i] for i in ids}
+    elif KEY_AC:
+        automaton, residual = KEY_AC
+        for _, cats in automaton.iter(snippet):
+            found.update(cats)
+            if len(found) == n: break
+        for cat, rx in residual.items():
+            if cat not in found and rx.search(snippet): found.add(cat)
+    else:
+        for m in KEY_RE.finditer(snippet):
+            found.add(m.lastgroup)
+            if len(found) == n: break
+    return {k: k in found for k in KEY_PATTERNS}
+
 def rule_summary(form: str, text: str) -> dict:
-    snippet = text[:4000] if text else ""
-    hits = {k: bool(re.search(p, snippet, re.IGNORECASE)) for k,p in KEY_PATTERNS.items()}
+    snippet = text[:SNIPPET_CHARS] if text else ""
+    hits = key_hits(snippet)
     score = 0
     if hits.get("buyback"): score += 2
     if hits.get("financing"): score -= 2
@@ -134,10 +466,28 @@ def rule_summary(form: str, text: str) -> dict:
     if hits.get("guidance"):  bullets.append("Guidance/outlook language present.")
     return {"impact": impact, "headline": headline, "bullets": bullets}
 
+@st.cache_data(show_spinner=False, ttl=3600)
+def _rule_summary_cached(form: str, snippet_hash: str, _snippet: str) -> dict:
+    return rule_summary(form, _snippet)
+
+def rule_summary_cached(form: str, text: str) -> dict:
+    """rule_summary memoized on (form, digest of the scanned snippet) so reruns skip the scan."""
+    snippet = (text or "")[:SNIPPET_CHARS]
+    return _rule_summary_cached(form, text_digest(snippet), snippet)
+
 def compact_paragraph_from_rule(rs: dict) -> str:
     bits = " ".join(b.rstrip(".") + "." for b in rs.get("bullets", []))
     return (rs["headline"] + (" " + bits if bits else "")).strip()
 
+# Low-value, high-volume forms: signals come from the submissions metadata and the
+# primary document is only downloaded on request (unless AI summaries need it).
+META_ONLY_FORMS = {"3", "4", "5", "3/A", "4/A", "5/A", "144", "SC 13G", "SC 13G/A"}
+
+def filing_meta_text(form: str, description: str | None, items: str | None) -> str:
+    """Pseudo-document from submissions fields, e.g. items "1.01,9.01" → "Item 1.01 Item 9.01"."""
+    item_refs = " ".join(f"Item {i.strip()}" for i in (items or "").split(",") if i.strip())
+    return f"Form {form}\n{description or ''}\n{item_refs}"
+
 # -------------------- AI status & key-aware cached summaries --------------------
 def ai_diagnostics(model: str | None) -> str:
     if not model:
@@ -148,59 +498,89 @@ def ai_diagnostics(model: str | None) -> str:
         key = os.getenv("OPENAI_API_KEY")
     if not key:
         return "OFF — OPENAI_API_KEY missing in Secrets."
-    if OpenAI is None:
+    if openai_cls() is None:
         return "OFF — openai package not installed."
+    return _ai_reachability(model, text_digest(key), key)
+
+@st.cache_data(show_spinner=False, ttl=300)
+def _ai_reachability(model: str, key_hash: str, _api_key: str) -> str:
+    """Runs on every rerun otherwise, so it is cached for 5 min per (model, key digest)
+    and uses models.retrieve, which is not billed, instead of a 1-token completion.
+    Quota errors only show up on billed calls, so they are reported per summary instead."""
     try:
-        client = OpenAI(api_key=key)
-        client.chat.completions.create(
-            model=model, messages=[{"role":"user","content":"ping"}],
-            max_tokens=1, temperature=0.0,
-        )
+        openai_cls()(api_key=_api_key).models.retrieve(model)
         return "ON — key ok & model reachable."
     except Exception as e:
         msg = str(e)
-        if "insufficient_quota" in msg:
-            return "OFF — key has insufficient quota."
         if "429" in msg or "rate_limit" in msg:
-            return "ON (rate-limited) — increase delay."
+            return "ON (rate-limited) — lower concurrency."
         return f"OFF — {msg[:120]}"
 
-@st.cache_data(show_spinner=False, ttl=7*24*3600)
-def ai_summarize_cached(accession: str, form: str, excerpt: str, model: str, api_key: str) -> str:
-    """Cache key includes api_key and accession to avoid stale empty results."""
-    if not api_key or not OpenAI:
-        return ""
-    client = OpenAI(api_key=api_key)
-    prompt = f"""Summarize the SEC filing excerpt in ONE concise paragraph (4–6 sentences).
+def ai_error_text(e: Exception) -> str:
+    msg = str(e)
+    if "insufficient_quota" in msg:
+        return "key has insufficient quota."
+    if "429" in msg or "rate_limit" in msg:
+        return "rate-limited — lower concurrency."
+    return msg[:120]
+
+AI_INSTRUCTIONS = """You are a precise equity research assistant.
+Summarize the SEC filing excerpt in ONE concise paragraph (4–6 sentences).
 Focus on financing (ATM/PIPE/warrants), buybacks, guidance, M&A, crypto holdings, and any Item references (1.01/2.01/3.02/5.02/5.07).
-Be factual, neutral, and precise. Avoid speculation.
+Be factual, neutral, and precise. Avoid speculation."""
 
-Form: {form}
+@st.cache_data(show_spinner=False, ttl=7*24*3600)
+def ai_summarize_cached(accession: str, form: str, excerpt_hash: str, model: str, api_key: str, _excerpt: str) -> str:
+    """Cache key includes api_key and accession to avoid stale empty results.
+    The excerpt itself is keyed by its digest (`_excerpt` is not hashed by Streamlit).
+    Errors propagate (Streamlit doesn't cache exceptions), so a transient 429 is retried
+    on the next run instead of being cached as an empty summary for a week."""
+    client = openai_cls()(api_key=api_key)
+    user_input = f"Form: {form}\n\nFiling excerpt (partial):\n{_excerpt}"
+    openai_acquire((len(AI_INSTRUCTIONS) + len(user_input)) // 4 + 300)   # rough input tokens + output cap
+    resp = client.responses.create(
+        model=model,
+        instructions=AI_INSTRUCTIONS,
+        input=user_input,
+        temperature=0.2,
+        max_output_tokens=300,
+        store=False,
+    )
+    text = (resp.output_text or "").strip()
+    if not text:
+        raise ValueError("empty response from model")
+    return text
+
+async def _ai_summarize_all(jobs: list[tuple[str, str, Future]], model: str, api_key: str,
+                            concurrency: int) -> tuple[dict, dict]:
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(accession: str, form: str, doc: Future) -> tuple[str, str, str]:
+        try:
+            full_text = await asyncio.wrap_future(doc)   # summarize as soon as this document lands
+        except Exception:
+            return accession, "", ""                     # reported in the render loop
+        excerpt = (full_text or "")[:AI_EXCERPT_CHARS]     # control tokens
+        async with sem:
+            try:
+                # the cached call is sync; run it off-loop so cache misses overlap
+                return accession, await asyncio.to_thread(
+                    ai_summarize_cached, accession, form, text_digest(excerpt), model, api_key, excerpt), ""
+            except Exception as e:
+                return accession, "", ai_error_text(e)
 
-Filing excerpt (partial):
-{excerpt}
-"""
-    try:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role":"system","content":"You are a precise equity research assistant."},
-                {"role":"user","content":prompt},
-            ],
-            temperature=0.2,
-            max_tokens=300,
-        )
-        return resp.choices[0].message.content.strip()
-    except Exception:
-        return ""
+    results = await asyncio.gather(*(one(*j) for j in jobs))
+    return ({acc: para for acc, para, _ in results if para},
+            {acc: err for acc, _, err in results if err})
 
-def ai_one_paragraph(accession: str, form: str, full_text: str, model: str, delay_s: float) -> str:
+def ai_summarize_all(jobs: list[tuple[str, str, Future]], model: str, concurrency: int) -> tuple[dict, dict]:
+    """(accession, form, document future) jobs → ({accession: paragraph}, {accession: error});
+    at most `concurrency` calls in flight. Each summary starts when its own download finishes,
+    not after all of them."""
     api_key = get_secret("OPENAI_API_KEY", "")
-    if not api_key or not OpenAI:
-        return ""
-    time.sleep(max(0.0, delay_s))          # pacing
-    excerpt = (full_text or "")[:6000]     # control tokens
-    return ai_summarize_cached(accession, form, excerpt, model, api_key)
+    if not jobs or not api_key or not openai_cls():
+        return {}, {}
+    return asyncio.run(_ai_summarize_all(jobs, model, api_key, concurrency))
 
 # -------------------- sidebar --------------------
 with st.sidebar:
@@ -216,14 +596,13 @@ with st.sidebar:
     use_ai  = st.checkbox("Use OpenAI one-paragraph summaries (optional)", value=False)
     ai_model = st.text_input("OpenAI model", value="gpt-4o-mini") if use_ai else None
     max_ai   = st.slider("Max AI summaries this run", 0, 20, 5)
-    ai_delay = st.slider("Delay before each OpenAI call (sec)", 0.0, 3.0, 1.2, 0.1)
-    sec_delay= st.slider("Delay between SEC doc downloads (sec)", 0.0, 3.0, 1.0, 0.1)
+    ai_conc  = st.slider("Concurrent OpenAI calls", 1, 8, 4)
 
     # AI status + cache clear
     st.caption(f"**AI status:** {ai_diagnostics(ai_model)}")
-    if st.button("Clear summary cache"):
-        st.cache_data.clear()
-        st.experimental_rerun()
+    if st.button("Clear AI cache"):
+        ai_summarize_cached.clear()   # only AI summaries; SEC data and document text stay cached
+        st.rerun()
 
     st.markdown("---")
     max_rows = st.slider("Number of recent filings", 1, 50, 5, step=1, help="Most-recent first")
@@ -234,6 +613,7 @@ with st.sidebar:
 if not cik10:
     st.info("Enter a ticker or CIK to begin.")
     st.stop()
+cik_int = int(cik10)   # unpadded form used in Archives URLs
 
 # -------------------- fetch filings --------------------
 with st.spinner("Fetching submissions from SEC…"):
@@ -248,67 +628,100 @@ recent = company.get("filings",{}).get("recent",{})
 if not recent:
     st.warning("No recent filings found."); st.stop()
 
-cols = ["accessionNumber","filingDate","reportDate","acceptanceDateTime",
-        "form","items","size","primaryDocument","primaryDocDescription"]
-rows = []
-for i in range(len(recent.get("accessionNumber", []))):
-    row = {c: recent.get(c,[None]*len(recent.get("accessionNumber",[])))[i] for c in cols}
-    acc = row["accessionNumber"].replace("-","")
-    row["url_index"]   = f"{ARCHIVES}/edgar/data/{int(cik10)}/{acc}-index.html"
-    row["url_primary"] = f"{ARCHIVES}/edgar/data/{int(cik10)}/{acc}/{row['primaryDocument']}"
-    rows.append(row)
-
-df = pd.DataFrame(rows)
-if forms_filter: df = df[df["form"].isin(forms_filter)]
+df = filings_frame(cik10, recent)
+
+# forms + keyword fused into one mask over the precomputed search column
+mask = pd.Series(True, index=df.index)
+if forms_filter: mask &= df["form"].isin(forms_filter)
 if keyword:
-    kw = keyword.strip().lower()
-    df = df[df.apply(lambda r: kw in str(r.to_dict()).lower(), axis=1)]
+    mask &= df["_search"].str.contains(keyword.strip().lower(), regex=False)
+df = df[mask]
 df = df.sort_values("filingDate", ascending=False).head(max_rows).reset_index(drop=True)
 
+# links only for the rows actually shown, not every filing in the submissions feed
+base = f"{ARCHIVES}/edgar/data/{cik_int}/" + df["accessionNumber"].astype(str).str.replace("-", "", regex=False)
+df["url_index"]   = base + "-index.html"
+df["url_primary"] = base + "/" + df["primaryDocument"].astype(str)
+
 st.markdown("### Latest Filings")
 
+# -------------------- prefetch documents (concurrent, rate-limited) --------------------
+# rows that will actually get an AI summary; only these need metadata-only forms downloaded
+ai_ready = bool(use_ai and max_ai and get_secret("OPENAI_API_KEY", "") and openai_cls())
+ai_rows  = set(df.head(max_ai)["accessionNumber"]) if ai_ready else set()
+
+pool = doc_executor()
+docs = {r["accessionNumber"]: pool.submit(get_primary_doc_text, r["url_primary"])
+        for _, r in df.iterrows()
+        if r["form"] not in META_ONLY_FORMS or r["accessionNumber"] in ai_rows}
+
+# -------------------- AI summaries (concurrent) --------------------
+summaries, ai_errors = {}, {}
+if ai_ready:
+    jobs = [(r["accessionNumber"], r["form"], docs[r["accessionNumber"]])
+            for _, r in df.head(max_ai).iterrows()]
+    with st.spinner("Summarizing with OpenAI…"):
+        summaries, ai_errors = ai_summarize_all(jobs, ai_model, ai_conc)
+
 # -------------------- render --------------------
-ai_calls = 0
+def render_signals(rs: dict, para: str = "") -> None:
+    # impact pill
+    impact_color = {"Positive":"#16a34a","Neutral":"#64748b","Negative":"#dc2626"}.get(rs["impact"],"#64748b")
+    st.markdown(
+        f"<div style='display:inline-block;padding:4px 10px;border-radius:12px;background:{impact_color};color:#fff;font-weight:600;'>"
+        f"{rs['impact']}</div>", unsafe_allow_html=True
+    )
+
+    st.markdown(f"**Rule-based headline:** {rs['headline']}")
+    if rs["bullets"]:
+        st.markdown("**Signals detected:**")
+        for b in rs["bullets"]:
+            st.markdown(f"- {b}")
+
+    # one-paragraph summary (AI preferred)
+    used_ai = bool(para)
+    if not para:
+        para = compact_paragraph_from_rule(rs)
+
+    st.markdown("**Summary (one paragraph):** " + ("_AI_ ✅" if used_ai else "_Rule-based_"))
+    st.write(para)
+
+@st.fragment
+def render_meta_only(r: pd.Series) -> None:
+    """Metadata-based signals; clicking the button fetches the document and reruns only this fragment."""
+    loaded = f"doc_loaded_{r['accessionNumber']}"
+    if not st.session_state.get(loaded):
+        st.caption("Signals from filing metadata only — primary document not downloaded.")
+        render_signals(rule_summary_cached(r['form'], filing_meta_text(r['form'], r['primaryDocDescription'], r['items'])))
+        st.button("Analyze primary document", key=f"load_{r['accessionNumber']}",
+                  on_click=st.session_state.__setitem__, args=(loaded, True))
+        return
+    with st.spinner("Fetching primary document…"):
+        try:
+            text = get_primary_doc_text(r['url_primary'])
+        except Exception as e:
+            st.error(f"Document fetch failed: {e}")
+            return
+    render_signals(rule_summary_cached(r['form'], text))
+
 for _, r in df.iterrows():
     with st.expander(f"{r['filingDate']} • {r['form']} • {r['primaryDocDescription']}"):
         st.write(f"Accession: {r['accessionNumber']}")
         st.write(f"[Index]({r['url_index']}) • [Primary Document]({r['url_primary']})")
 
-        # SEC pacing
+        if r['accessionNumber'] not in docs:
+            render_meta_only(r)
+            continue
+
         with st.spinner("Fetching primary document…"):
             try:
-                time.sleep(sec_delay)
-                text = get_primary_doc_text(cik10, r['accessionNumber'], r['primaryDocument'])
+                text = docs[r['accessionNumber']].result()
             except Exception as e:
                 st.error(f"Document fetch failed: {e}")
                 continue
 
-        rs = rule_summary(r['form'], text)
-
-        # impact pill
-        impact_color = {"Positive":"#16a34a","Neutral":"#64748b","Negative":"#dc2626"}.get(rs["impact"],"#64748b")
-        st.markdown(
-            f"<div style='display:inline-block;padding:4px 10px;border-radius:12px;background:{impact_color};color:#fff;font-weight:600;'>"
-            f"{rs['impact']}</div>", unsafe_allow_html=True
-        )
-
-        st.markdown(f"**Rule-based headline:** {rs['headline']}")
-        if rs["bullets"]:
-            st.markdown("**Signals detected:**")
-            for b in rs["bullets"]:
-                st.markdown(f"- {b}")
-
-        # one-paragraph summary (AI preferred)
-        used_ai, para = False, ""
-        if use_ai and ai_calls < max_ai:
-            p = ai_one_paragraph(r['accessionNumber'], r['form'], text, ai_model, ai_delay)
-            if p:
-                para, used_ai = p, True
-                ai_calls += 1
-        if not para:
-            para = compact_paragraph_from_rule(rs)
-
-        st.markdown("**Summary (one paragraph):** " + ("_AI_ ✅" if used_ai else "_Rule-based_"))
-        st.write(para)
+        render_signals(rule_summary_cached(r['form'], text), summaries.get(r['accessionNumber'], ""))
+        if r['accessionNumber'] in ai_errors:
+            st.warning(f"AI summary failed — {ai_errors[r['accessionNumber']]} Showing the rule-based summary.")
 
 st.caption("Data: SEC EDGAR. Summaries are heuristic or AI-generated — not investment advice.")